@@ -10,7 +10,9 @@ from bpe_encoder import BPEEncoder
 
 # Load encoder
 try:
-    encoder = BPEEncoder.from_file("merges.json")
+    # merges.bin loads faster; from_file only uses it when it was converted
+    # from this exact merges.json, so a retrained JSON is never shadowed
+    encoder = BPEEncoder.from_file("merges.json", binary_path="merges.bin")
     print(f"✅ Loaded encoder with vocabulary size: {encoder.get_vocab_size()}")
 except FileNotFoundError:
     print("❌ merges.json not found! Please generate it from the notebook.")
@@ -40,6 +42,30 @@ def encode_text(text):
         return {"error": str(e)}
 
 
+def encode_batch_text(texts_str):
+    """Encode newline-separated texts to tokens in parallel."""
+    if not encoder:
+        return {"error": "Encoder not loaded. Please check merges.json file."}
+    
+    texts = [line for line in (texts_str or "").splitlines() if line.strip()]
+    if not texts:
+        return {"error": "Please enter some text (one text per line)."}
+    
+    try:
+        batch_tokens = encoder.encode_batch(texts)
+        
+        return {
+            "results": [
+                {"text": text, "tokens": tokens, "num_tokens": len(tokens)}
+                for text, tokens in zip(texts, batch_tokens)
+            ],
+            "num_texts": len(texts),
+            "total_tokens": sum(len(tokens) for tokens in batch_tokens)
+        }
+    except Exception as e:
+        return {"error": str(e)}
+
+
 def decode_tokens(tokens_str):
     """Decode tokens back to text."""
     if not encoder:
@@ -101,8 +127,9 @@ with gr.Blocks(title="BPE Encoder for Hindi Text") as demo:
     
     ### How to use:
     1. **Encode:** Enter Hindi text and get token IDs
-    2. **Decode:** Enter comma-separated token IDs and get text back
-    3. **Round-trip:** Test encoding and decoding to verify correctness
+    2. **Batch Encode:** Enter several lines of text and encode them in parallel
+    3. **Decode:** Enter comma-separated token IDs and get text back
+    4. **Round-trip:** Test encoding and decoding to verify correctness
     """)
     
     with gr.Tab("📝 Encode"):
@@ -121,6 +148,22 @@ with gr.Blocks(title="BPE Encoder for Hindi Text") as demo:
             outputs=encode_output
         )
     
+    with gr.Tab("📚 Batch Encode"):
+        gr.Markdown("### Encode several texts at once (one per line)")
+        batch_input = gr.Textbox(
+            label="Input Texts (one per line)",
+            placeholder="हम होंगे कामयाब\nहम होंगे कामयाब एक दिन",
+            lines=8
+        )
+        batch_btn = gr.Button("Encode Batch", variant="primary")
+        batch_output = gr.JSON(label="Encoded Results")
+        
+        batch_btn.click(
+            fn=encode_batch_text,
+            inputs=batch_input,
+            outputs=batch_output
+        )
+    
     with gr.Tab("🔓 Decode"):
         gr.Markdown("### Decode token IDs back to text")
         tokens_input = gr.Textbox(
@@ -17,8 +17,50 @@ Usage:
     text = encoder.decode(tokens)
 """
 
+import hashlib
+import heapq
 import json
-from typing import List, Dict, Tuple, Optional
+import mmap
+import multiprocessing
+import os
+import re
+import struct
+import sys
+import threading
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from typing import List, Dict, Tuple, Optional, Sequence
+
+# Binary merges file header: vocab_size, num_merges, pattern length in bytes,
+# SHA-256 of the JSON file it was converted from (zeros if none)
+_BINARY_HEADER = struct.Struct("<III32s")
+# Binary merges file record: p0, p1, idx
+_BINARY_MERGE = struct.Struct("<iii")
+
+# Only texts (or pre-tokenized chunks) of at most this many characters are
+# memoized, so the encode cache stays bounded in bytes, not just entries
+_ENCODE_CACHE_MAX_CHARS = 1024
+
+# Batches with fewer characters than this are encoded serially: starting a
+# process pool costs more than encoding a few short texts
+_BATCH_PARALLEL_MIN_CHARS = 100_000
+
+# Decodes of at most this many token IDs are memoized
+_DECODE_CACHE_MAX_IDS = 64
+
+# Chunks shorter than this many bytes are encoded with plain lists, which
+# are cheaper to set up; longer ones use compact int32 arrays
+_ARRAY_MIN_BYTES = 1024
+
+# Heap entries in encode() pack (rank, position) into one int
+_POS_BITS = 32
+_POS_MASK = (1 << _POS_BITS) - 1
+
+# Devanagari vowel signs, virama and other combining marks, plus ZWNJ/ZWJ.
+# Python's re does not treat these as word characters, so they are listed
+# explicitly to keep Hindi words in one piece.
+_DEVANAGARI_MARKS = "\u0900-\u0903\u093A-\u094F\u0951-\u0957\u0962\u0963\u200C\u200D"
 
 
 class BPEEncoder:
@@ -29,33 +71,111 @@ class BPEEncoder:
     the Hindi Wikipedia dataset with a vocabulary size of 5000 tokens.
     """
     
-    def __init__(self, merges: Dict[Tuple[int, int], int], vocab_size: int = 5000):
+    # Pre-tokenization pattern: runs of letters, digits or other symbols,
+    # each with an optional leading space, and runs of whitespace
+    SPLIT_PATTERN = (
+        rf" ?(?:[^\W\d_]|[{_DEVANAGARI_MARKS}])+"
+        r"| ?\d+"
+        rf"| ?(?:_|[^\s\w{_DEVANAGARI_MARKS}])+"
+        r"|\s+(?!\S)"
+        r"|\s+"
+    )
+    
+    def __init__(
+        self,
+        merges: Dict[Tuple[int, int], int],
+        vocab_size: int = 5000,
+        cache_size: int = 4096,
+        pattern: Optional[str] = None
+    ):
         """
         Initialize the BPE encoder.
         
         Args:
             merges: Dictionary mapping byte pairs (tuple) to token IDs
             vocab_size: Total vocabulary size (default: 5000)
+            cache_size: Maximum number of chunks kept in the encode cache
+                (default: 4096); chunks longer than 1024 characters are
+                never cached
+            pattern: Regex used to split text into chunks before applying
+                merges, e.g. SPLIT_PATTERN. Must match the pattern used in
+                training. None (default) applies merges across the whole
+                text, which is how the bundled merges.json was trained.
         """
         self.merges = merges
         self.vocab_size = vocab_size
+        self.pattern = pattern
+        self._pat = re.compile(pattern) if pattern else None
+        
+        # Lookup tables are built on first use: encode-only callers never
+        # pay for the vocabulary, decode-only callers never for the ranks
         self._vocab = None
-        self._build_vocab()
+        self._ranks = None
+        self._stride = None
+        
+        # Repeated chunks are served from an LRU cache instead of re-running BPE,
+        # and short token lists that were decoded before skip the byte join
+        self._cache_enabled = True
+        self._cache_size = cache_size
+        self._encode_cached = lru_cache(maxsize=cache_size)(self._encode_chunk)
+        self._decode_cached = lru_cache(maxsize=256)(self._decode_ids)
+        
+        # Worker pool for encode_batch, started on the first large batch and
+        # reused by later calls (see _get_pool)
+        self._pool = None
+        self._pool_workers = 0
+        self._pool_lock = threading.Lock()
+    
+    def _merges_in_order(self) -> List[Tuple[Tuple[int, int], int]]:
+        """Return the merges as ((p0, p1), idx) items in rank order."""
+        items = list(self.merges.items())
+        
+        # Merges loaded from file are already in rank order, which a single
+        # linear pass confirms; only sort dictionaries built in another order
+        ids = list(self.merges.values())
+        if not all(a < b for a, b in zip(ids, ids[1:])):
+            items.sort(key=lambda x: x[1])
+        return items
     
     def _build_vocab(self):
-        """Build the vocabulary dictionary from merges."""
+        """Build the vocabulary list (token ID -> bytes) from merges."""
         # Start with base 256 byte tokens
-        vocab = {idx: bytes([idx]) for idx in range(256)}
-        
-        # Build vocabulary by applying merges in order
-        # We need to sort merges by their token ID to apply in correct order
-        sorted_merges = sorted(self.merges.items(), key=lambda x: x[1])
+        vocab = [bytes([idx]) for idx in range(256)]
         
-        for (p0, p1), idx in sorted_merges:
-            vocab[idx] = vocab[p0] + vocab[p1]
+        # Build vocabulary by applying merges in order; a list indexed by
+        # token ID is cheaper to look up in decode than a dict
+        for (p0, p1), idx in self._merges_in_order():
+            if idx != len(vocab):
+                raise ValueError(f"Merge IDs must be contiguous from 256, got {idx}")
+            vocab.append(vocab[p0] + vocab[p1])
         
         self._vocab = vocab
     
+    def _build_ranks(self):
+        """Build the flat pair-to-rank lookup table used by encode."""
+        # Key each pair as a single int (p0 * stride + p1) so that a lookup
+        # hashes one int instead of allocating and hashing a tuple
+        stride = max(self.vocab_size, max(self.merges.values(), default=255) + 1)
+        ranks = {p0 * stride + p1: idx for (p0, p1), idx in self.merges.items()}
+        # Publish _stride before _ranks: another thread that sees _ranks set
+        # skips the build and reads _stride straight away
+        self._stride = stride
+        self._ranks = ranks
+    
+    @property
+    def _token_bytes(self) -> List[bytes]:
+        """Vocabulary list (token ID -> bytes), built on first access."""
+        if self._vocab is None:
+            self._build_vocab()
+        return self._vocab
+    
+    @property
+    def _rank_table(self) -> Dict[int, int]:
+        """Flat pair-to-rank table, built on first access."""
+        if self._ranks is None:
+            self._build_ranks()
+        return self._ranks
+    
     @staticmethod
     def _get_stats(ids: List[int]) -> Dict[Tuple[int, int], int]:
         """Count frequency of all consecutive byte pairs."""
@@ -88,23 +208,176 @@ class BPEEncoder:
         Returns:
             List of token IDs
         """
+        # Merges never cross chunk boundaries, so each chunk is encoded alone
+        # finditer/group(0) yields whole matches even if the pattern has
+        # capturing groups (findall would return the group contents)
+        if self._pat is None:
+            chunks = (text,)
+        else:
+            chunks = (m.group(0) for m in self._pat.finditer(text))
+        
+        cache_enabled = self._cache_enabled
+        encode_cached = self._encode_cached
+        encode_chunk = self._encode_chunk
+        
+        tokens = []
+        for chunk in chunks:
+            if cache_enabled and len(chunk) <= _ENCODE_CACHE_MAX_CHARS:
+                tokens.extend(encode_cached(chunk))
+            else:
+                tokens.extend(encode_chunk(chunk))
+        return tokens
+    
+    def encode_batch(
+        self,
+        texts: List[str],
+        num_threads: Optional[int] = None
+    ) -> List[List[int]]:
+        """
+        Encode a list of texts in parallel.
+        
+        BPE runs in pure Python and holds the GIL, so large batches are
+        spread over a pool of worker processes, each with its own copy of
+        the encoder. The pool is kept for later calls; use close() to shut
+        it down. Small batches are encoded serially in this process, where
+        they also benefit from the encode cache.
+        
+        Args:
+            texts: Input text strings
+            num_threads: Number of workers (default: number of CPUs)
+            
+        Returns:
+            List of token ID lists, in the same order as texts
+        """
+        if num_threads is None:
+            num_threads = os.cpu_count() or 1
+        
+        if (
+            min(num_threads, len(texts)) <= 1
+            or sum(map(len, texts)) < _BATCH_PARALLEL_MIN_CHARS
+        ):
+            return [self.encode(text) for text in texts]
+        
+        # Hand out texts in batches to keep inter-process traffic low
+        chunksize = max(1, len(texts) // (num_threads * 4))
+        # map submits every text up front, so holding the lock while it runs
+        # keeps another call from shutting the pool down mid-submission
+        with self._pool_lock:
+            results = self._get_pool(num_threads).map(
+                _encode_in_worker, texts, chunksize=chunksize
+            )
+        return list(results)
+    
+    def _get_pool(self, num_workers: int) -> ProcessPoolExecutor:
+        """Return the encode_batch worker pool, starting it if needed."""
+        # Called with self._pool_lock held
+        if self._pool is not None and self._pool_workers != num_workers:
+            # Work already submitted to the old pool still completes
+            self._pool.shutdown(wait=False)
+            self._pool = None
+        
+        if self._pool is None:
+            # Fork is unsafe from a multi-threaded process such as a Gradio
+            # server: a child can inherit a lock held by another thread.
+            # Start workers from a clean process instead.
+            if "forkserver" in multiprocessing.get_all_start_methods():
+                context = multiprocessing.get_context("forkserver")
+            else:
+                context = multiprocessing.get_context("spawn")
+            
+            self._pool = ProcessPoolExecutor(
+                max_workers=num_workers,
+                mp_context=context,
+                initializer=_init_worker,
+                initargs=(self.merges, self.vocab_size, self.pattern, self._cache_size)
+            )
+            self._pool_workers = num_workers
+        
+        return self._pool
+    
+    def close(self):
+        """Shut down the encode_batch worker pool, if one was started."""
+        with self._pool_lock:
+            if self._pool is not None:
+                self._pool.shutdown()
+                self._pool = None
+                self._pool_workers = 0
+    
+    def _encode_chunk(self, chunk: str) -> Tuple[int, ...]:
+        """Run BPE on a single chunk of text, bypassing the encode cache."""
         # Start with UTF-8 byte encoding
-        tokens = list(text.encode("utf-8"))
+        data = chunk.encode("utf-8")
+        n = len(data)
+        if n < 2:
+            return tuple(data)
+        
+        # Token buffer plus a doubly-linked list over token positions
+        # (-1 marks either end). Long inputs are held in int32 arrays rather
+        # than lists of int objects to keep memory down.
+        if n < _ARRAY_MIN_BYTES:
+            tokens = list(data)
+            prev = list(range(-1, n - 1))
+            nxt = list(range(1, n + 1))
+        else:
+            tokens = array('i', iter(data))
+            prev = array('i', range(-1, n - 1))
+            nxt = array('i', range(1, n + 1))
+        nxt[-1] = -1
+        
+        get_rank = self._rank_table.get
+        stride = self._stride
+        heappush = heapq.heappush
+        heappop = heapq.heappop
+        
+        # Min-heap of rank/position entries for every mergeable adjacent
+        # pair, packed into a single int (rank in the high bits) so that
+        # heap comparisons are plain int compares rather than tuple ones.
+        # Merge IDs are assigned in creation order, so the ID is the rank.
+        heap = []
+        for i, (p0, p1) in enumerate(zip(tokens, tokens[1:])):
+            rank = get_rank(p0 * stride + p1)
+            if rank is not None:
+                heap.append(rank << _POS_BITS | i)
+        heapq.heapify(heap)
         
         # Apply merges greedily (in order of creation)
-        while len(tokens) >= 2:
-            stats = self._get_stats(tokens)
+        while heap:
+            entry = heappop(heap)
+            rank = entry >> _POS_BITS
+            i = entry & _POS_MASK
+            j = nxt[i]
             
-            # Find the pair with the lowest merge index (earliest merge)
-            pair = min(stats, key=lambda p: self.merges.get(p, float("inf")))
+            # Lazy deletion: skip entries made stale by an earlier merge
+            if j == -1 or get_rank(tokens[i] * stride + tokens[j]) != rank:
+                continue
             
-            if pair not in self.merges:
-                break  # No more merges possible
+            # Merge the pair into position i and unlink position j
+            tokens[i] = rank
+            tokens[j] = -1
+            k = nxt[j]
+            nxt[i] = k
+            if k != -1:
+                prev[k] = i
             
-            idx = self.merges[pair]
-            tokens = self._merge(tokens, pair, idx)
+            # Queue the two new pairs formed with the neighbours
+            p = prev[i]
+            if p != -1:
+                new_rank = get_rank(tokens[p] * stride + rank)
+                if new_rank is not None:
+                    heappush(heap, new_rank << _POS_BITS | p)
+            if k != -1:
+                new_rank = get_rank(rank * stride + tokens[k])
+                if new_rank is not None:
+                    heappush(heap, new_rank << _POS_BITS | i)
         
-        return tokens
+        # Walk the linked list to collect the surviving tokens
+        result = []
+        i = 0
+        while i != -1:
+            result.append(tokens[i])
+            i = nxt[i]
+        
+        return tuple(result)
     
     def decode(self, ids: List[int]) -> str:
         """
@@ -116,53 +389,199 @@ class BPEEncoder:
         Returns:
             Decoded text string
         """
-        # Concatenate byte sequences for each token
-        tokens = b"".join(self._vocab[idx] for idx in ids)
+        # Accept any iterable of IDs, as a plain join over it would
+        if not isinstance(ids, (list, tuple)):
+            ids = list(ids)
+        
+        if self._cache_enabled and len(ids) <= _DECODE_CACHE_MAX_IDS:
+            return self._decode_cached(tuple(ids))
+        return self._decode_ids(ids)
+    
+    def _decode_ids(self, ids: Sequence[int]) -> str:
+        """Decode token IDs to text, bypassing the decode cache."""
+        vocab = self._token_bytes
+        
+        # The vocabulary is a list, so a negative ID would silently index
+        # from the end; reject out-of-range IDs as unknown tokens
+        if ids:
+            for idx in (min(ids), max(ids)):
+                if not 0 <= idx < len(vocab):
+                    raise KeyError(idx)
+        
+        # Concatenate byte sequences for each token; join sizes the result
+        # up front and copies every piece into a single allocation
+        tokens = b"".join(map(vocab.__getitem__, ids))
         
-        # Decode from UTF-8
-        text = tokens.decode("utf-8", errors="replace")
-        return text
+        # Decode from UTF-8. Merged tokens come from valid UTF-8 text, so the
+        # fast strict decoder almost always succeeds; only fall back to
+        # replacing malformed bytes when it does not.
+        try:
+            return tokens.decode("utf-8")
+        except UnicodeDecodeError:
+            return tokens.decode("utf-8", errors="replace")
     
-    def save(self, filepath: str):
+    def save(self, filepath: str, description: Optional[str] = None):
         """
         Save the encoder (merges dictionary) to a JSON file.
         
         Args:
             filepath: Path to save the JSON file
+            description: Optional free-text description stored in the file
         """
-        # Convert tuple keys to lists for JSON serialization
-        merges_json = {f"{k[0]},{k[1]}": v for k, v in self.merges.items()}
+        # Store merges as [p0, p1] pairs in rank order; the position in the
+        # list gives the token ID (256 + position), so the IDs must be
+        # contiguous or loading the file would renumber them
+        merges_json = []
+        for (p0, p1), idx in self._merges_in_order():
+            if idx != 256 + len(merges_json):
+                raise ValueError(f"Merge IDs must be contiguous from 256, got {idx}")
+            merges_json.append([p0, p1])
         
         data = {
             "merges": merges_json,
             "vocab_size": self.vocab_size,
-            "num_merges": len(self.merges)
+            "num_merges": len(self.merges),
+            "pattern": self.pattern
         }
+        if description is not None:
+            data["description"] = description
+        
+        # Write one [p0, p1] pair per line: indent=2 would spread every int
+        # over its own line and inflate the file by more than half
+        pairs = ",\n".join(f"    [{p0}, {p1}]" for p0, p1 in merges_json)
+        rest = json.dumps({k: v for k, v in data.items() if k != "merges"}, indent=2)
         
         with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2)
+            f.write('{\n  "merges": [\n' + pairs + '\n  ],\n' + rest[2:])
     
     @classmethod
-    def from_file(cls, filepath: str) -> 'BPEEncoder':
+    def from_file(cls, filepath: str, binary_path: Optional[str] = None) -> 'BPEEncoder':
         """
         Load encoder from a saved JSON file.
         
         Args:
             filepath: Path to the JSON file containing merges
+            binary_path: Optional binary copy (see save_binary) to load
+                instead, used only if it was converted from this exact JSON
+                content; otherwise the JSON is parsed
+            
+        Returns:
+            BPEEncoder instance
+        """
+        with open(filepath, 'rb') as f:
+            raw = f.read()
+        
+        # Compare content hashes rather than mtimes: a fresh checkout gives
+        # both files the same mtime whichever one is out of date
+        if binary_path is not None and os.path.exists(binary_path):
+            with open(binary_path, 'rb') as f:
+                header = f.read(_BINARY_HEADER.size)
+            if (
+                len(header) == _BINARY_HEADER.size
+                and _BINARY_HEADER.unpack(header)[3] == hashlib.sha256(raw).digest()
+            ):
+                return cls.from_binary(binary_path)
+        
+        data = json.loads(raw.decode('utf-8'))
+        
+        if isinstance(data["merges"], dict):
+            # Older files map "p0,p1" string keys to token IDs
+            merges = {}
+            for key, value in data["merges"].items():
+                k1, k2 = map(int, key.split(','))
+                merges[(k1, k2)] = value
+        else:
+            # Pairs are listed in rank order, starting at token ID 256
+            merges = {
+                (p0, p1): idx
+                for idx, (p0, p1) in enumerate(data["merges"], 256)
+            }
+        
+        return cls(
+            merges,
+            data.get("vocab_size", 5000),
+            pattern=data.get("pattern")
+        )
+    
+    def save_binary(self, filepath: str, source: Optional[str] = None):
+        """
+        Save the encoder to a compact binary file for fast loading.
+        
+        The file holds a little-endian header (vocab_size, num_merges,
+        pattern length, SHA-256 of the source JSON file), one int32
+        (p0, p1, idx) triple per merge in rank order, and finally the UTF-8
+        encoded split pattern, if any.
+        
+        Args:
+            filepath: Path to save the binary file
+            source: Optional JSON file these merges were saved to; its hash
+                lets from_file(source, binary_path=filepath) detect a stale
+                binary copy
+        """
+        table = array('i')
+        for (p0, p1), idx in self._merges_in_order():
+            table.extend((p0, p1, idx))
+        if sys.byteorder == 'big':
+            table.byteswap()
+        
+        pattern = self.pattern.encode('utf-8') if self.pattern else b""
+        
+        digest = bytes(32)
+        if source is not None:
+            with open(source, 'rb') as f:
+                digest = hashlib.sha256(f.read()).digest()
+        
+        with open(filepath, 'wb') as f:
+            f.write(_BINARY_HEADER.pack(self.vocab_size, len(self.merges), len(pattern), digest))
+            table.tofile(f)
+            f.write(pattern)
+    
+    @classmethod
+    def from_binary(cls, filepath: str) -> 'BPEEncoder':
+        """
+        Load encoder from a binary file written by save_binary.
+        
+        Args:
+            filepath: Path to the binary file containing merges
             
         Returns:
             BPEEncoder instance
         """
-        with open(filepath, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        # Map the file and unpack the records in place, without first
+        # copying the whole file into a bytes object
+        with (
+            open(filepath, 'rb') as f,
+            mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm,
+            memoryview(mm) as view
+        ):
+            vocab_size, num_merges, pattern_len, _ = _BINARY_HEADER.unpack_from(view)
+            table_end = _BINARY_HEADER.size + _BINARY_MERGE.size * num_merges
+            
+            merges = {
+                (p0, p1): idx
+                for p0, p1, idx in _BINARY_MERGE.iter_unpack(view[_BINARY_HEADER.size:table_end])
+            }
+            pattern = str(view[table_end:table_end + pattern_len], 'utf-8') or None
         
-        # Convert string keys back to tuples
-        merges = {}
-        for key, value in data["merges"].items():
-            k1, k2 = map(int, key.split(','))
-            merges[(k1, k2)] = value
+        return cls(merges, vocab_size, pattern=pattern)
+    
+    def clear_cache(self):
+        """Drop all cached encodings and decodings."""
+        self._encode_cached.cache_clear()
+        self._decode_cached.cache_clear()
+    
+    def set_cache_enabled(self, enabled: bool):
+        """
+        Turn the encode and decode caches on or off.
+        
+        Disabling the caches also clears them.
         
-        return cls(merges, data.get("vocab_size", 5000))
+        Args:
+            enabled: Whether encode and decode should consult the caches
+        """
+        self._cache_enabled = enabled
+        if not enabled:
+            self.clear_cache()
     
     def get_vocab_size(self) -> int:
         """Get the vocabulary size."""
@@ -173,6 +592,26 @@ class BPEEncoder:
         return len(self.merges)
 
 
+# Per-process encoder used by BPEEncoder.encode_batch workers
+_worker_encoder = None
+
+
+def _init_worker(
+    merges: Dict[Tuple[int, int], int],
+    vocab_size: int,
+    pattern: Optional[str],
+    cache_size: int
+):
+    """Build the encoder once in each worker process."""
+    global _worker_encoder
+    _worker_encoder = BPEEncoder(merges, vocab_size, cache_size=cache_size, pattern=pattern)
+
+
+def _encode_in_worker(text: str) -> List[int]:
+    """Encode a single text with the worker's encoder."""
+    return _worker_encoder.encode(text)
+
+
 # Example usage
 if __name__ == "__main__":
     # This is just for testing - in practice, load from saved file
@@ -286,11 +286,15 @@ def encode(text):
   # given a string, return list of integers (the tokens)
   tokens = list(text.encode("utf-8"))
   while len(tokens) >= 2:
-    stats = get_stats(tokens)
-    pair = min(stats, key=lambda p: merges.get(p, float("inf")))
-    if pair not in merges:
+    # find the pair with the lowest merge index in a single scan
+    # (no stats dict and no key lambda per pair)
+    pair, idx = None, float("inf")
+    for p in zip(tokens, tokens[1:]):
+      rank = merges.get(p, idx)
+      if rank < idx:
+        pair, idx = p, rank
+    if pair is None:
       break # nothing else can be merged
-    idx = merges[pair]
     tokens = merge(tokens, pair, idx)
   return tokens
 
@@ -0,0 +1,86 @@
+"""
+Regression check for the BPE encoder.
+
+Compares BPEEncoder.encode against the naive greedy merge loop (rescan
+all pairs, apply the lowest-ranked merge, repeat) and verifies the
+encode/decode round trip.
+
+Usage:
+    python check_encoder.py
+"""
+
+import random
+import sys
+
+from bpe_encoder import BPEEncoder
+
+
+def naive_encode(encoder: BPEEncoder, text: str) -> list:
+    """Reference encoder: the original greedy loop over the whole text."""
+    tokens = list(text.encode("utf-8"))
+    while len(tokens) >= 2:
+        stats = encoder._get_stats(tokens)
+        pair = min(stats, key=lambda p: encoder.merges.get(p, float("inf")))
+        if pair not in encoder.merges:
+            break  # No more merges possible
+        tokens = encoder._merge(tokens, pair, encoder.merges[pair])
+    return tokens
+
+
+def sample_texts(seed: int = 0, count: int = 200) -> list:
+    """Build repeated-byte, mixed-script and random test inputs."""
+    rng = random.Random(seed)
+
+    texts = [
+        "",
+        "a",
+        "हम होंगे कामयाब",
+        "हम होंगे कामयाब, 2024 में! foo_bar  x\n\n y",
+        "aaaaaaaaaaaaaaaaa",
+        " " * 50,
+        "ा" * 40,
+        "के के के के के के",
+        "‍क्‍ष",
+    ]
+
+    alphabet = (
+        [chr(c) for c in range(0x0900, 0x0980)]
+        + list("abcdefghij ABC 0123 .,!?\n\t_")
+        + ["के", " के", "में", " है", "ा", "्"]
+    )
+    for i in range(count):
+        # A few long inputs exercise the array-backed path for big chunks
+        length = rng.randint(1500, 3000) if i % 20 == 0 else rng.randint(1, 400)
+        texts.append("".join(rng.choice(alphabet) for _ in range(length)))
+
+    return texts
+
+
+def main():
+    try:
+        encoder = BPEEncoder.from_file("merges.json")
+    except FileNotFoundError:
+        print("❌ merges.json not found!")
+        return 1
+    encoder.set_cache_enabled(False)
+
+    failures = 0
+    for text in sample_texts():
+        tokens = encoder.encode(text)
+        if tokens != naive_encode(encoder, text):
+            failures += 1
+            print(f"❌ encode mismatch for {text[:40]!r}")
+        if encoder.decode(tokens) != text:
+            failures += 1
+            print(f"❌ round-trip mismatch for {text[:40]!r}")
+
+    if failures:
+        print(f"❌ {failures} check(s) failed")
+        return 1
+
+    print("✅ encode matches the naive greedy loop and round-trips")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
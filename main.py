@@ -1,8 +1,11 @@
 from __future__ import annotations
 
+import os
+import shutil
 import subprocess
 import sys
 from pathlib import Path
+from typing import BinaryIO
 
 REPO_URL = "https://github.com/AI4Bharat/sangraha-internet-archive-download.git"
 WORKSPACE_ROOT = Path(__file__).resolve().parent
@@ -10,6 +13,7 @@ THIRD_PARTY_DIR = WORKSPACE_ROOT / "third_party"
 REPO_DIR = THIRD_PARTY_DIR / "sangraha-internet-archive-download"
 OUTPUT_TEXT = WORKSPACE_ROOT / "input_marathi.txt"
 DOWNLOAD_STAGING = WORKSPACE_ROOT / "_marathi_download"
+COPY_BUFSIZE = 1 << 20
 
 
 def ensure_repo() -> None:
@@ -44,6 +48,27 @@ def run_download(language: str) -> None:
     subprocess.run(cmd, check=True)
 
 
+def append_file(path: Path, sink: BinaryIO) -> None:
+    """Append the raw bytes of ``path`` to ``sink`` without loading it whole."""
+    with path.open("rb") as src:
+        offset = 0
+        if hasattr(os, "sendfile"):
+            # Copy in kernel space; flush first so buffered bytes stay in order
+            sink.flush()
+            size = os.fstat(src.fileno()).st_size
+            try:
+                while offset < size:
+                    sent = os.sendfile(sink.fileno(), src.fileno(), offset, size - offset)
+                    if sent == 0:
+                        break
+                    offset += sent
+            except OSError:
+                pass  # fall back to a buffered copy of whatever is left
+            src.seek(offset)
+
+        shutil.copyfileobj(src, sink, COPY_BUFSIZE)
+
+
 def collect_text() -> None:
     text_files = sorted(DOWNLOAD_STAGING.glob("*.txt"))
     if not text_files:
@@ -51,10 +76,12 @@ def collect_text() -> None:
             "No text files were downloaded. Inspect the staging directory for details."
         )
 
-    with OUTPUT_TEXT.open("w", encoding="utf-8") as sink:
+    # Stream the files as bytes: they are already UTF-8, so there is no need
+    # to decode them into memory and encode them again
+    with OUTPUT_TEXT.open("wb") as sink:
         for path in text_files:
-            sink.write(path.read_text(encoding="utf-8"))
-            sink.write("\n")
+            append_file(path, sink)
+            sink.write(b"\n")
 
 
 def main() -> None:
@@ -10,9 +10,11 @@ Usage in notebook:
     save_merges_to_file(merges, 'merges.json', vocab_size=5000)
 """
 
-import json
+import os
 from typing import Dict, Tuple
 
+from bpe_encoder import BPEEncoder
+
 
 def save_merges_to_file(
     merges: Dict[Tuple[int, int], int],
@@ -22,25 +24,26 @@ def save_merges_to_file(
     """
     Save the merges dictionary to a JSON file.
     
+    A binary copy for fast loading (see BPEEncoder.save_binary) is written
+    next to it with a .bin extension, tagged with the JSON file's hash so
+    BPEEncoder.from_file can tell when it is stale.
+    
     Args:
         merges: Dictionary mapping byte pairs (tuple) to token IDs
         filepath: Path to save the JSON file
         vocab_size: Total vocabulary size
     """
-    # Convert tuple keys to strings for JSON serialization
-    merges_json = {f"{k[0]},{k[1]}": v for k, v in merges.items()}
-    
-    data = {
-        "merges": merges_json,
-        "vocab_size": vocab_size,
-        "num_merges": len(merges),
-        "description": "BPE merges trained on Hindi Wikipedia dataset (1000 articles)"
-    }
+    # BPEEncoder.save stores the merges as [p0, p1] pairs in rank order
+    encoder = BPEEncoder(merges, vocab_size)
+    encoder.save(
+        filepath,
+        description="BPE merges trained on Hindi Wikipedia dataset (1000 articles)"
+    )
     
-    with open(filepath, 'w', encoding='utf-8') as f:
-        json.dump(data, f, indent=2)
+    binary_path = os.path.splitext(filepath)[0] + ".bin"
+    encoder.save_binary(binary_path, source=filepath)
     
-    print(f"✅ Saved {len(merges)} merges to {filepath}")
+    print(f"✅ Saved {len(merges)} merges to {filepath} and {binary_path}")
     print(f"   Vocabulary size: {vocab_size}")
     print(f"   Number of merges: {len(merges)}")
 